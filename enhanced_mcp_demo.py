@@ -6,17 +6,43 @@ With DynamoDB-Specific Extensions: Partition Key Optimizer, Capacity Planner, St
 
 import streamlit as st
 import json
-import boto3
 import random
 import re
+import ast
+import copy
+import functools
+import operator
 from datetime import datetime, timedelta
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Tuple
 import pandas as pd
+import numpy as np
 import uuid
+from collections import deque
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+    _ORJSON_OPTIONS = orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+    
+    def _json_dumps(obj: Any) -> str:
+        """Pretty-printed JSON text for display"""
+        return orjson.dumps(obj, option=_ORJSON_OPTIONS, default=str).decode()
+except ImportError:  # orjson is optional; fall back to the stdlib codec
+    _json_loads = json.loads
+    
+    def _json_dumps(obj: Any) -> str:
+        """Pretty-printed JSON text for display"""
+        return json.dumps(obj, indent=2, default=str)
 
 # Page config
 st.set_page_config(page_title="Enhanced DynamoDB MCP", page_icon="🚀", layout="wide")
 
+# Wall-clock snapshot taken once per script rerun and shared by all telemetry in that run
+_RERUN_NOW = datetime.now()
+_RERUN_TS = _RERUN_NOW.timestamp()
+_RERUN_ISO = _RERUN_NOW.isoformat()
+_RERUN_TODAY = _RERUN_NOW.date()
+
 # CSS
 st.markdown("""
 <style>
@@ -55,6 +81,74 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# Bedrock client shared across reruns and sessions
+@st.cache_resource(show_spinner=False)
+def _get_bedrock_client(region: str):
+    """Build one Bedrock runtime client per region"""
+    import boto3  # Deferred: botocore loading is only paid once the Chat tab needs it
+    return boto3.client('bedrock-runtime', region_name=region)
+
+# Table schema descriptions fed to the LLM prompt
+_TABLE_SCHEMAS: Dict[str, str] = {
+    'users': 'Primary key: user_id. Fields: name, email, age, city',
+    'products': 'Primary key: product_id. Fields: name, price, category, rating',
+    'orders': 'Primary key: order_id. Fields: user_id, product_id, quantity, total, status',
+    'reviews': 'Primary key: review_id. Fields: product_id, user_id, rating, comment, date',
+    'inventory': 'Primary key: item_id. Fields: product_id, warehouse, quantity, last_updated'
+}
+
+# Prompt template, built once at import time
+_PROMPT_TEMPLATE = """Convert this natural language to DynamoDB action JSON.
+
+Table: {table}
+Schema: {schema}
+Request: "{text}"
+
+Return only JSON:
+{{
+  "action": "get_item|put_item|update_item|delete_item|scan|query",
+  "table_name": "{table}",
+  "key": {{"field": "value"}},
+  "item": {{"field": "value"}},
+  "updates": {{"field": "value"}}
+}}
+
+Examples:
+"Get user jordan" → {{"action": "get_item", "table_name": "{table}", "key": {{"user_id": "jordan"}}}}
+"Create user jordan" → {{"action": "put_item", "table_name": "{table}", "item": {{"user_id": "jordan", "name": "New User"}}}}"""
+
+# Outermost {...} span in an LLM completion
+_JSON_RE = re.compile(r'\{.*\}', re.DOTALL)
+
+# Cached Bedrock completion, keyed by the request text, table and schema
+@st.cache_data(ttl=3600, max_entries=512, show_spinner=False)
+def _parse_with_bedrock(_client, text: str, table_name: str, schema: str):
+    """Invoke Claude once per distinct request; errors raise so they are never cached"""
+    prompt = _PROMPT_TEMPLATE.format(table=table_name, schema=schema, text=text)
+    
+    body = json.dumps({
+        "anthropic_version": "bedrock-2023-05-31",
+        "max_tokens": 300,
+        "messages": [
+            {"role": "user", "content": prompt}
+        ],
+        "temperature": 0
+    })
+    
+    response = _client.invoke_model(
+        body=body,
+        modelId="anthropic.claude-3-haiku-20240307-v1:0",
+        accept="application/json",
+        contentType="application/json"
+    )
+    
+    response_body = _json_loads(response.get('body').read())
+    completion = response_body['content'][0]['text']
+    
+    # Extract JSON from response
+    match = _JSON_RE.search(completion)
+    return _json_loads(match.group(0)) if match else None
+
 # Bedrock-powered Natural Language Processor
 class NaturalLanguageProcessor:
     """Uses AWS Bedrock to convert natural language to SQL/MCP actions"""
@@ -66,7 +160,7 @@ class NaturalLanguageProcessor:
     def set_credentials(self, region: str = 'us-east-1'):
         """Initialize Bedrock client"""
         self.region = region
-        self.bedrock = boto3.client('bedrock-runtime', region_name=region)
+        self.bedrock = _get_bedrock_client(region)
     
     def parse_request(self, text: str, table_name: str) -> Dict[str, Any]:
         """Parse natural language request using Bedrock"""
@@ -74,68 +168,22 @@ class NaturalLanguageProcessor:
             return {'action': 'error', 'message': 'Bedrock client not initialized'}
         
         schema = self._get_table_schema(table_name)
-        
-        prompt = f"""Convert this natural language to DynamoDB action JSON.
-
-Table: {table_name}
-Schema: {schema}
-Request: "{text}"
-
-Return only JSON:
-{{
-  "action": "get_item|put_item|update_item|delete_item|scan|query",
-  "table_name": "{table_name}",
-  "key": {{"field": "value"}},
-  "item": {{"field": "value"}},
-  "updates": {{"field": "value"}}
-}}
-
-Examples:
-"Get user jordan" → {{"action": "get_item", "table_name": "{table_name}", "key": {{"user_id": "jordan"}}}}
-"Create user jordan" → {{"action": "put_item", "table_name": "{table_name}", "item": {{"user_id": "jordan", "name": "New User"}}}}"""
+        # Collapse whitespace so trivially different phrasings share a cache entry
+        text = " ".join(text.split())
         
         try:
-            body = json.dumps({
-                "anthropic_version": "bedrock-2023-05-31",
-                "max_tokens": 300,
-                "messages": [
-                    {"role": "user", "content": prompt}
-                ],
-                "temperature": 0
-            })
-            
-            response = self.bedrock.invoke_model(
-                body=body,
-                modelId="anthropic.claude-3-haiku-20240307-v1:0",
-                accept="application/json",
-                contentType="application/json"
-            )
-            
-            response_body = json.loads(response.get('body').read())
-            completion = response_body['content'][0]['text']
-            
-            # Extract JSON from response
-            json_start = completion.find('{')
-            json_end = completion.rfind('}') + 1
-            if json_start >= 0 and json_end > json_start:
-                result = json.loads(completion[json_start:json_end])
-                return result
-            else:
-                return {'action': 'error', 'message': 'Could not parse LLM response'}
-                
+            result = _parse_with_bedrock(self.bedrock, text, table_name, schema)
         except Exception as e:
             return {'action': 'error', 'message': f'Bedrock error: {str(e)}'}
+        
+        if result is None:
+            return {'action': 'error', 'message': 'Could not parse LLM response'}
+        return result
     
-    def _get_table_schema(self, table_name: str) -> str:
+    @staticmethod
+    def _get_table_schema(table_name: str) -> str:
         """Get table schema description"""
-        schemas = {
-            'users': 'Primary key: user_id. Fields: name, email, age, city',
-            'products': 'Primary key: product_id. Fields: name, price, category, rating',
-            'orders': 'Primary key: order_id. Fields: user_id, product_id, quantity, total, status',
-            'reviews': 'Primary key: review_id. Fields: product_id, user_id, rating, comment, date',
-            'inventory': 'Primary key: item_id. Fields: product_id, warehouse, quantity, last_updated'
-        }
-        return schemas.get(table_name, 'Primary key: id')
+        return _TABLE_SCHEMAS.get(table_name, 'Primary key: id')
 
 # Sample data
 SAMPLE_ITEMS = [
@@ -146,16 +194,34 @@ SAMPLE_ITEMS = [
     {"user_id": "user005", "name": "Eva Brown", "email": "eva@example.com", "age": 26, "city": "Seattle"}
 ]
 
+# Follow-up actions attached to every generated stream event
+_STREAM_RECOMMENDATIONS = (
+    "Send to real-time personalization engine",
+    "Update user behavior analytics",
+    "Trigger recommendation refresh"
+)
+
+def _approx_json_size(d: Dict) -> int:
+    """Estimate an item's serialized size in bytes without encoding it"""
+    return sum(len(str(k)) + len(str(v)) for k, v in d.items()) + 2 * len(d) + 2
+
+# Upper bound on retained query/scan telemetry records
+_TELEMETRY_MAXLEN = 500
+
+def _latest(records: deque, n: int = 3) -> List[Dict]:
+    """Last n telemetry records, oldest first (deques cannot be sliced)"""
+    return [records[i] for i in range(max(len(records) - n, 0), len(records))]
+
 # DynamoDB Extensions
 class DynamoDBExtensions:
     def __init__(self):
-        self.query_patterns = []
+        self.query_patterns = deque(maxlen=_TELEMETRY_MAXLEN)
         self.capacity_usage = {"RCU": 0, "WCU": 0}
-        self.scan_operations = []
+        self.scan_operations = deque(maxlen=_TELEMETRY_MAXLEN)
         
     def partition_key_optimizer(self, query_pattern: str, uses_partition_key: bool) -> Dict:
         """Validates efficient partition key usage"""
-        self.query_patterns.append({"pattern": query_pattern, "uses_pk": uses_partition_key, "timestamp": datetime.now()})
+        self.query_patterns.append({"pattern": query_pattern, "uses_pk": uses_partition_key, "timestamp": _RERUN_NOW})
         
         if not uses_partition_key:
             return {
@@ -172,17 +238,21 @@ class DynamoDBExtensions:
     
     def capacity_planner(self, operation_type: str, item_size_kb: float = 1.0) -> Dict:
         """Monitors and recommends capacity adjustments"""
-        if operation_type in ["put_item", "update_item", "delete_item"]:
+        if operation_type in ["put_item", "update_item", "delete_item", "batch_write_item"]:
             wcu_consumed = max(1, int(item_size_kb))
             self.capacity_usage["WCU"] += wcu_consumed
         else:
             rcu_consumed = max(1, int(item_size_kb / 4))  # 4KB per RCU
             self.capacity_usage["RCU"] += rcu_consumed
         
-        # Calculate recommendations
         total_ops = st.session_state.mcp_costs['operations'] if 'mcp_costs' in st.session_state else 1
-        avg_rcu = self.capacity_usage["RCU"] / max(total_ops, 1)
-        avg_wcu = self.capacity_usage["WCU"] / max(total_ops, 1)
+        return self.capacity_report(self.capacity_usage["RCU"], self.capacity_usage["WCU"], total_ops)
+    
+    @staticmethod
+    def capacity_report(rcu: int, wcu: int, total_ops: int) -> Dict:
+        """Capacity recommendations for the given usage, without consuming any"""
+        avg_rcu = rcu / max(total_ops, 1)
+        avg_wcu = wcu / max(total_ops, 1)
         
         recommendations = []
         if avg_rcu > 5:
@@ -193,26 +263,33 @@ class DynamoDBExtensions:
             recommendations.append("Current usage suits pay-per-request billing")
         
         return {
-            "current_usage": self.capacity_usage,
+            "current_usage": {"RCU": rcu, "WCU": wcu},
             "average_per_operation": {"RCU": avg_rcu, "WCU": avg_wcu},
             "recommendations": recommendations,
             "billing_recommendation": "PROVISIONED" if (avg_rcu > 5 or avg_wcu > 5) else "PAY_PER_REQUEST"
         }
     
-    def stream_event_adapter(self, operation: str, item_data: Dict) -> Dict:
+    def stream_event_adapter(self, operation: str, item_data: Dict, size_bytes: Optional[int] = None) -> Dict:
         """Converts operations into DynamoDB Stream-like events for AI workflows"""
+        if size_bytes is None:
+            size_bytes = _approx_json_size(item_data)
+        
+        # Stream records are ordered, so number them from a per-session sequence
+        seq = st.session_state._stream_seq
+        st.session_state._stream_seq = seq + 1
+        
         stream_event = {
-            "eventID": f"stream-{random.randint(100000, 999999)}",
+            "eventID": f"stream-{seq:06d}",
             "eventName": operation.upper(),
             "eventVersion": "1.1",
             "eventSource": "aws:dynamodb",
             "awsRegion": "us-east-1",
             "dynamodb": {
-                "ApproximateCreationDateTime": datetime.now().timestamp(),
+                "ApproximateCreationDateTime": _RERUN_TS,
                 "Keys": {"user_id": {"S": item_data.get("user_id", "unknown")}},
-                "NewImage": {k: {"S": str(v)} for k, v in item_data.items()},
-                "SequenceNumber": f"{random.randint(100000000, 999999999)}",
-                "SizeBytes": len(json.dumps(item_data)),
+                "NewImage": {k: {"S": v if type(v) is str else str(v)} for k, v in item_data.items()},
+                "SequenceNumber": f"{seq + 100000000}",
+                "SizeBytes": size_bytes,
                 "StreamViewType": "NEW_AND_OLD_IMAGES"
             }
         }
@@ -222,34 +299,34 @@ class DynamoDBExtensions:
             "user_id": item_data.get("user_id"),
             "operation": operation,
             "data": item_data,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": _RERUN_ISO,
             "ai_context": {
                 "user_segment": "active" if item_data.get("age", 0) > 25 else "young",
                 "location_tier": "tier1" if item_data.get("city") in ["San Francisco", "New York"] else "tier2",
-                "engagement_score": random.randint(1, 100)
+                "engagement_score": int(random.random() * 100) + 1
             }
         }
         
         return {
             "stream_event": stream_event,
             "ai_payload": ai_payload,
-            "processing_recommendations": [
-                "Send to real-time personalization engine",
-                "Update user behavior analytics",
-                "Trigger recommendation refresh"
-            ]
+            "processing_recommendations": _STREAM_RECOMMENDATIONS
         }
     
     def index_advisor(self, query_pattern: str, filter_attributes: List[str], result_count: int, scanned_count: int) -> Dict:
         """Detects inefficient queries and suggests indexes"""
-        scan_ratio = scanned_count / max(result_count, 1)
-        
         self.scan_operations.append({
             "pattern": query_pattern,
-            "scan_ratio": scan_ratio,
+            "scan_ratio": scanned_count / max(result_count, 1),
             "filter_attributes": filter_attributes,
-            "timestamp": datetime.now()
+            "timestamp": _RERUN_NOW
         })
+        return self.index_report(filter_attributes, result_count, scanned_count)
+    
+    @staticmethod
+    def index_report(filter_attributes: List[str], result_count: int, scanned_count: int) -> Dict:
+        """Index suggestions for a scan ratio, without recording the operation"""
+        scan_ratio = scanned_count / max(result_count, 1)
         
         recommendations = []
         index_suggestions = []
@@ -280,38 +357,178 @@ class DynamoDBExtensions:
             ]
         }
 
+# Tab4 capacity and index reports are pure functions of their inputs, so reruns reuse them
+@st.cache_data(max_entries=128, show_spinner=False)
+def _cached_capacity_report(rcu: int, wcu: int, total_ops: int) -> Dict:
+    return DynamoDBExtensions.capacity_report(rcu, wcu, total_ops)
+
+@st.cache_data(max_entries=128, show_spinner=False)
+def _cached_index_report(filter_attributes: List[str], result_count: int, scanned_count: int) -> Dict:
+    return DynamoDBExtensions.index_report(filter_attributes, result_count, scanned_count)
+
+# Matches a condition that is exactly one "<attr> = <value>" clause, with the value optionally single-quoted
+_KEY_CONDITION_RE = re.compile(r"\s*(\w+)\s*=\s*(?:'([^']*)'|(\S+))\s*")
+
+# Attributes the index advisor can suggest a GSI for
+_INDEXABLE_ATTRS = ("age", "city")
+_INDEXABLE_ATTRS_RE = re.compile(r"\b(" + "|".join(_INDEXABLE_ATTRS) + r")\b")
+
+def _filter_attributes(expression: str) -> List[str]:
+    """Indexable attributes referenced by a condition, found in a single regex pass"""
+    found = set(_INDEXABLE_ATTRS_RE.findall(expression))
+    return [attr for attr in _INDEXABLE_ATTRS if attr in found]
+
+# Condition syntax: clauses joined by AND/OR, AND binding tighter as in DynamoDB
+_OR_RE = re.compile(r"\s+OR\s+")
+_AND_RE = re.compile(r"\s+AND\s+")
+
+# Clause operator -> comparison over one column
+_CLAUSE_OPS = {
+    "=": operator.eq,
+    "<>": operator.ne,
+    "!=": operator.ne,
+    ">=": operator.ge,
+    "<=": operator.le,
+    ">": operator.gt,
+    "<": operator.lt,
+    "contains": lambda column, value: column.str.contains(value, regex=False),
+    "begins_with": lambda column, value: column.str.startswith(value)
+}
+
+def _clause_mask(column: pd.Series, op: str, value: Any) -> pd.Series:
+    """Boolean mask for one clause; rows whose value cannot be compared with the literal never match"""
+    if isinstance(value, str):
+        # Only string entries take part; numbers and missing values become NA
+        values = column.where(column.map(type).eq(str)).astype("string")
+        return _CLAUSE_OPS[op](values, value).fillna(False).astype(bool)
+    values = pd.to_numeric(column, errors="coerce")
+    return _CLAUSE_OPS[op](values, value) & values.notna()
+
+# Literal types a clause may compare against
+_CLAUSE_VALUE_TYPES = (str, int, float)
+
+# One pattern per clause form, tried in order; the value is captured as literal text
+_CLAUSE_PATTERNS = (
+    re.compile(r"(\w+)\s+(contains|begins_with)\s+('[^']*')"),
+    re.compile(r"(\w+)\s*(<>|!=|>=|<=|=|>|<)\s*(.+)")
+)
+
+def _parse_clause(clause: str) -> Tuple[str, str, Any]:
+    """Split one clause into (attribute, operator, literal value); anything else is rejected"""
+    for pattern in _CLAUSE_PATTERNS:
+        match = pattern.fullmatch(clause)
+        if match:
+            attr, op, text = match.groups()
+            try:
+                value = ast.literal_eval(text)
+            except (ValueError, SyntaxError):
+                value = None
+            # Containers and other literals would broadcast or compare element-wise
+            if not isinstance(value, _CLAUSE_VALUE_TYPES):
+                raise ValueError(f"Unsupported value in condition: {text}")
+            return attr, op, value
+    raise ValueError(f"Unsupported condition: {clause}")
+
+@functools.lru_cache(maxsize=256)
+def _parse_filter(expression: str) -> Tuple[Tuple[Tuple[str, str, Any], ...], ...]:
+    """Parse a DynamoDB-style condition ("age > 30 AND name contains 'J'") into OR-groups of AND-ed clauses; raises ValueError"""
+    return tuple(
+        tuple(_parse_clause(clause) for clause in _AND_RE.split(group))
+        for group in _OR_RE.split(expression.strip())
+    )
+
+def _condition_error(expression: str, error: Exception) -> str:
+    """Error message for a condition the parser or mask builder rejected"""
+    detail = error.args[0] if error.args else error
+    return f"Invalid condition '{expression}': {detail}"
+
+def _new_table(key_schema: Dict) -> Dict:
+    """Empty in-memory table record"""
+    return {
+        "items": {},
+        "key_schema": key_schema,
+        "created_at": _RERUN_NOW,
+        "query_patterns": deque(maxlen=_TELEMETRY_MAXLEN),
+        "scan_operations": deque(maxlen=_TELEMETRY_MAXLEN),
+        "_version": 0,
+        "_df_cache": None
+    }
+
+# Maximum put requests DynamoDB accepts in one BatchWriteItem call
+_BATCH_WRITE_LIMIT = 25
+
 # Enhanced MCP Tools
 class EnhancedMCPDynamoDBTools:
+    # Per-operation costs, resolved once at class definition
+    _CREATE_TABLE_COST = 0.0
+    _PUT_ITEM_COST = 0.00125
+    _GET_ITEM_COST = 0.00025
+    _QUERY_COST = 0.00025
+    _SCAN_COST = 0.00025
+    _UPDATE_ITEM_COST = 0.00125
+    _DELETE_ITEM_COST = 0.00125
+    _BATCH_WRITE_COST = 0.00125
+    _BATCH_GET_COST = 0.00025
+    
     def __init__(self):
+        # Kept for introspection; tool methods read the class constants directly
         self.operation_costs = {
-            "create_table": 0.0,
-            "put_item": 0.00125,
-            "get_item": 0.00025,
-            "query": 0.00025,
-            "scan": 0.00025,
-            "update_item": 0.00125,
-            "delete_item": 0.00125,
-            "batch_write": 0.00125,
-            "batch_get": 0.00025
+            "create_table": self._CREATE_TABLE_COST,
+            "put_item": self._PUT_ITEM_COST,
+            "get_item": self._GET_ITEM_COST,
+            "query": self._QUERY_COST,
+            "scan": self._SCAN_COST,
+            "update_item": self._UPDATE_ITEM_COST,
+            "delete_item": self._DELETE_ITEM_COST,
+            "batch_write": self._BATCH_WRITE_COST,
+            "batch_get": self._BATCH_GET_COST
         }
         self.extensions = DynamoDBExtensions()
     
+    def _get_frame(self, table_name: str) -> Tuple[List[Dict], pd.DataFrame]:
+        """Return the table's items as (rows, DataFrame indexed by item key), rebuilt only after a write"""
+        table = st.session_state.tables[table_name]
+        cached = table["_df_cache"]
+        if cached is None or cached[0] != table["_version"]:
+            rows = list(table["items"].values())
+            cached = (table["_version"], rows, pd.DataFrame(rows, index=list(table["items"])))
+            table["_df_cache"] = cached
+        return cached[1], cached[2]
+    
+    def _select(self, table_name: str, expression: str) -> np.ndarray:
+        """Selection vector: positions of the rows matching a condition, from one vectorized mask"""
+        _, df = self._get_frame(table_name)
+        groups = _parse_filter(expression)
+        if df.empty:
+            return np.empty(0, dtype=np.intp)
+        # The mask is built column by column from parsed clauses; condition text is never evaluated
+        mask = None
+        for group in groups:
+            group_mask = None
+            for attr, op, value in group:
+                if attr not in df.columns:
+                    raise KeyError(f"Unknown attribute: {attr}")
+                clause_mask = _clause_mask(df[attr], op, value)
+                group_mask = clause_mask if group_mask is None else group_mask & clause_mask
+            mask = group_mask if mask is None else mask | group_mask
+        mask = mask.to_numpy()
+        # flatnonzero would treat any nonzero value as a match, so only true boolean masks select rows
+        if mask.dtype != bool:
+            raise TypeError(f"Condition does not produce a boolean mask: {expression}")
+        return np.flatnonzero(mask)
+    
     def create_table(self, table_name: str, key_schema: Dict) -> Dict:
         """MCP Tool: Create DynamoDB table"""
-        cost = self.operation_costs["create_table"]
-        st.session_state.mcp_costs["total"] += cost
-        st.session_state.mcp_costs["operations"] += 1
+        cost = self._CREATE_TABLE_COST
+        costs = st.session_state.mcp_costs
+        costs["total"] += cost
+        costs["operations"] += 1
         
         if table_name in st.session_state.tables:
             return {"success": False, "error": "Table already exists", "cost": cost}
         
-        st.session_state.tables[table_name] = {
-            "items": {},
-            "key_schema": key_schema,
-            "created_at": datetime.now(),
-            "query_patterns": [],
-            "scan_operations": []
-        }
+        st.session_state.tables[table_name] = _new_table(key_schema)
+        st.session_state._tables_version += 1
         st.session_state.current_table = table_name
         
         return {
@@ -324,9 +541,10 @@ class EnhancedMCPDynamoDBTools:
     
     def put_item(self, table_name: str, item: Dict) -> Dict:
         """MCP Tool: Put item with stream event generation"""
-        cost = self.operation_costs["put_item"]
-        st.session_state.mcp_costs["total"] += cost
-        st.session_state.mcp_costs["operations"] += 1
+        cost = self._PUT_ITEM_COST
+        costs = st.session_state.mcp_costs
+        costs["total"] += cost
+        costs["operations"] += 1
         
         if table_name not in st.session_state.tables:
             return {"success": False, "error": "Table does not exist", "cost": cost}
@@ -335,13 +553,17 @@ class EnhancedMCPDynamoDBTools:
         key_field = st.session_state.tables[table_name]["key_schema"]["partition_key"]
         item_key = item.get(key_field, f"item_{len(st.session_state.tables[table_name]['items'])}")
         st.session_state.tables[table_name]["items"][item_key] = item
+        st.session_state.tables[table_name]["_version"] += 1
+        st.session_state._tables_version += 1
+        
+        # Item size feeds both the stream record and the capacity estimate
+        size_bytes = _approx_json_size(item)
         
         # Generate stream event for AI workflows
-        stream_data = self.extensions.stream_event_adapter("INSERT", item)
+        stream_data = self.extensions.stream_event_adapter("INSERT", item, size_bytes)
         
         # Capacity analysis
-        item_size = len(json.dumps(item)) / 1024  # KB
-        capacity_analysis = self.extensions.capacity_planner("put_item", item_size)
+        capacity_analysis = self.extensions.capacity_planner("put_item", size_bytes / 1024)  # KB
         
         return {
             "success": True,
@@ -355,9 +577,10 @@ class EnhancedMCPDynamoDBTools:
     
     def query(self, table_name: str, key_condition: str, filter_expression: str = None) -> Dict:
         """MCP Tool: Query with optimization analysis"""
-        cost = self.operation_costs["query"]
-        st.session_state.mcp_costs["total"] += cost
-        st.session_state.mcp_costs["operations"] += 1
+        cost = self._QUERY_COST
+        costs = st.session_state.mcp_costs
+        costs["total"] += cost
+        costs["operations"] += 1
         
         if table_name not in st.session_state.tables:
             return {"success": False, "error": "Table does not exist", "cost": cost}
@@ -367,43 +590,53 @@ class EnhancedMCPDynamoDBTools:
         uses_partition_key = partition_key in key_condition
         partition_analysis = self.extensions.partition_key_optimizer(key_condition, uses_partition_key)
         
-        # Store query pattern for this table
-        st.session_state.tables[table_name]["query_patterns"].append({
-            "pattern": key_condition,
-            "uses_pk": uses_partition_key,
-            "timestamp": datetime.now()
-        })
+        # Store query pattern for this table (the record the optimizer just logged)
+        st.session_state.tables[table_name]["query_patterns"].append(self.extensions.query_patterns[-1])
         
         # Simulate query results
-        results = []
-        scanned_items = list(st.session_state.tables[table_name]["items"].values())
-        
-        for item in scanned_items:
-            if "age > 30" in key_condition and item.get("age", 0) > 30:
-                results.append(item)
-            elif "city = 'San Francisco'" in key_condition and item.get("city") == "San Francisco":
-                results.append(item)
-            elif "user_id" in key_condition and uses_partition_key:
-                results.append(item)
-                break  # Efficient partition key lookup
+        items = st.session_state.tables[table_name]["items"]
+        key_match = _KEY_CONDITION_RE.fullmatch(key_condition)
+        
+        if key_match and key_match.group(1) == partition_key:
+            # Partition key equality alone - direct hash access, no scan; compound conditions use _select
+            key_value = key_match.group(2) if key_match.group(2) is not None else key_match.group(3)
+            item = items.get(key_value)
+            results = [item] if item is not None else []
+            results_df = self._get_frame(table_name)[1].loc[[key_value]] if item is not None else None
+            match_count = scanned_count = len(results)
+        else:
+            scanned_count = len(items)
+            try:
+                selection = self._select(table_name, key_condition)
+            except (ValueError, KeyError, TypeError) as e:
+                return {"success": False, "error": _condition_error(key_condition, e), "cost": cost}
+            
+            if not len(selection):
+                results, results_df, match_count = [], None, 0
+            else:
+                # Only the returned page is materialized; the rest stays as row positions
+                rows, df = self._get_frame(table_name)
+                page = selection[:5]
+                results = [rows[i] for i in page]
+                results_df = df.take(page)
+                match_count = len(selection)
         
         # Capacity planning
         capacity_analysis = self.extensions.capacity_planner("query", 1.0)
         
         # Index analysis
-        filter_attrs = []
-        if "age" in key_condition: filter_attrs.append("age")
-        if "city" in key_condition: filter_attrs.append("city")
+        filter_attrs = _filter_attributes(key_condition)
         
         index_analysis = self.extensions.index_advisor(
-            key_condition, filter_attrs, len(results), len(scanned_items)
+            key_condition, filter_attrs, match_count, scanned_count
         )
         
         return {
             "success": True,
-            "items": results[:5],
-            "count": len(results),
-            "scanned_count": len(scanned_items),
+            "items": results,
+            "items_df": results_df,
+            "count": match_count,
+            "scanned_count": scanned_count,
             "cost": cost,
             "optimization_analysis": {
                 "partition_key_analysis": partition_analysis,
@@ -414,42 +647,49 @@ class EnhancedMCPDynamoDBTools:
     
     def scan(self, table_name: str, filter_expression: str = None) -> Dict:
         """MCP Tool: Scan with efficiency warnings"""
-        cost = self.operation_costs["scan"]
-        st.session_state.mcp_costs["total"] += cost
-        st.session_state.mcp_costs["operations"] += 1
+        cost = self._SCAN_COST
+        costs = st.session_state.mcp_costs
+        costs["total"] += cost
+        costs["operations"] += 1
         
         if table_name not in st.session_state.tables:
             return {"success": False, "error": "Table does not exist", "cost": cost}
         
-        items = list(st.session_state.tables[table_name]["items"].values())
+        rows, items_df = self._get_frame(table_name)
+        items = rows
+        if filter_expression and rows:
+            try:
+                selection = self._select(table_name, filter_expression)
+            except (ValueError, KeyError, TypeError) as e:
+                return {"success": False, "error": _condition_error(filter_expression, e), "cost": cost}
+            items = [rows[i] for i in selection]
+            items_df = items_df.take(selection)
         
         # Store scan operation for this table
         st.session_state.tables[table_name]["scan_operations"].append({
             "pattern": f"SCAN with filter: {filter_expression or 'none'}",
-            "scan_ratio": len(items),
+            "scan_ratio": len(rows),
             "filter_attributes": [],
-            "timestamp": datetime.now()
+            "timestamp": _RERUN_NOW
         })
         
         # Analyze scan efficiency
         partition_analysis = self.extensions.partition_key_optimizer("SCAN operation", False)
-        capacity_analysis = self.extensions.capacity_planner("scan", len(items) * 0.5)
+        capacity_analysis = self.extensions.capacity_planner("scan", len(rows) * 0.5)
         
-        filter_attrs = []
-        if filter_expression:
-            if "age" in filter_expression: filter_attrs.append("age")
-            if "city" in filter_expression: filter_attrs.append("city")
+        filter_attrs = _filter_attributes(filter_expression) if filter_expression else []
         
         index_analysis = self.extensions.index_advisor(
             f"SCAN with filter: {filter_expression or 'none'}", 
-            filter_attrs, len(items), len(items)
+            filter_attrs, len(items), len(rows)
         )
         
         return {
             "success": True,
             "items": items,
+            "items_df": items_df,
             "count": len(items),
-            "scanned_count": len(items),
+            "scanned_count": len(rows),
             "cost": cost,
             "optimization_analysis": {
                 "partition_key_analysis": partition_analysis,
@@ -460,9 +700,10 @@ class EnhancedMCPDynamoDBTools:
     
     def get_item(self, table_name: str, key: Dict) -> Dict:
         """MCP Tool: Get single item by key"""
-        cost = self.operation_costs["get_item"]
-        st.session_state.mcp_costs["total"] += cost
-        st.session_state.mcp_costs["operations"] += 1
+        cost = self._GET_ITEM_COST
+        costs = st.session_state.mcp_costs
+        costs["total"] += cost
+        costs["operations"] += 1
         
         if table_name not in st.session_state.tables:
             return {"success": False, "error": "Table does not exist", "cost": cost}
@@ -487,9 +728,10 @@ class EnhancedMCPDynamoDBTools:
     
     def update_item(self, table_name: str, key: Dict, updates: Dict) -> Dict:
         """MCP Tool: Update item"""
-        cost = self.operation_costs["update_item"]
-        st.session_state.mcp_costs["total"] += cost
-        st.session_state.mcp_costs["operations"] += 1
+        cost = self._UPDATE_ITEM_COST
+        costs = st.session_state.mcp_costs
+        costs["total"] += cost
+        costs["operations"] += 1
         
         if table_name not in st.session_state.tables:
             return {"success": False, "error": "Table does not exist", "cost": cost}
@@ -500,6 +742,7 @@ class EnhancedMCPDynamoDBTools:
         items = st.session_state.tables[table_name]["items"]
         if key_value in items:
             items[key_value].update(updates)
+            st.session_state.tables[table_name]["_version"] += 1
             return {
                 "success": True,
                 "updated_item": items[key_value],
@@ -514,9 +757,10 @@ class EnhancedMCPDynamoDBTools:
     
     def delete_item(self, table_name: str, key: Dict) -> Dict:
         """MCP Tool: Delete item"""
-        cost = self.operation_costs["delete_item"]
-        st.session_state.mcp_costs["total"] += cost
-        st.session_state.mcp_costs["operations"] += 1
+        cost = self._DELETE_ITEM_COST
+        costs = st.session_state.mcp_costs
+        costs["total"] += cost
+        costs["operations"] += 1
         
         if table_name not in st.session_state.tables:
             return {"success": False, "error": "Table does not exist", "cost": cost}
@@ -527,6 +771,8 @@ class EnhancedMCPDynamoDBTools:
         items = st.session_state.tables[table_name]["items"]
         if key_value in items:
             deleted_item = items.pop(key_value)
+            st.session_state.tables[table_name]["_version"] += 1
+            st.session_state._tables_version += 1
             return {
                 "success": True,
                 "deleted_item": deleted_item,
@@ -538,22 +784,70 @@ class EnhancedMCPDynamoDBTools:
                 "error": "Item not found",
                 "cost": cost
             }
+    
+    def batch_write_item(self, table_name: str, items: List[Dict]) -> Dict:
+        """MCP Tool: Batch write items in BatchWriteItem-sized pages"""
+        cost = self._BATCH_WRITE_COST * len(items)
+        costs = st.session_state.mcp_costs
+        costs["total"] += cost
+        costs["operations"] += 1
+        
+        if table_name not in st.session_state.tables:
+            return {"success": False, "error": "Table does not exist", "cost": cost}
+        
+        table = st.session_state.tables[table_name]
+        key_field = table["key_schema"]["partition_key"]
+        table_items = table["items"]
+        
+        # DynamoDB accepts at most 25 put requests per BatchWriteItem call
+        processed_items = []
+        pages = 0
+        for start in range(0, len(items), _BATCH_WRITE_LIMIT):
+            base = len(table_items)
+            page = {
+                item.get(key_field, f"item_{base + i}"): dict(item)
+                for i, item in enumerate(items[start:start + _BATCH_WRITE_LIMIT])
+            }
+            table_items.update(page)
+            processed_items.extend(page)
+            pages += 1
+        
+        if items:
+            table["_version"] += 1
+            st.session_state._tables_version += 1
+        
+        # One stream event and one capacity estimate for the whole batch
+        stream_data = self.extensions.stream_event_adapter("BATCH_WRITE", items[-1]) if items else None
+        batch_size = sum(_approx_json_size(item) for item in items) / 1024  # KB
+        capacity_analysis = self.extensions.capacity_planner("batch_write_item", batch_size)
+        
+        return {
+            "success": True,
+            "processed_items": processed_items,
+            "count": len(processed_items),
+            "batch_calls": pages,
+            "cost": cost,
+            "stream_event": stream_data["stream_event"] if stream_data else None,
+            "capacity_analysis": capacity_analysis
+        }
+
+# Default-ID prefix for each sample table's Put Item form
+_ID_PREFIXES = {"users": "u", "products": "p", "orders": "o", "reviews": "r", "inventory": "i"}
 
 # Initialize session state
-if 'tables' not in st.session_state:
-    st.session_state.tables = {}
-if 'current_table' not in st.session_state:
-    st.session_state.current_table = None
-if 'mcp_costs' not in st.session_state:
-    st.session_state.mcp_costs = {"total": 0.0, "operations": 0}
-if 'initialized' not in st.session_state:
-    st.session_state.initialized = False
+st.session_state.setdefault('tables', {})
+st.session_state.setdefault('current_table', None)
+st.session_state.setdefault('mcp_costs', {"total": 0.0, "operations": 0})
+st.session_state.setdefault('initialized', False)
+st.session_state.setdefault('chat_history', [])
+st.session_state.setdefault('bedrock_region', 'us-east-1')
+st.session_state.setdefault('_stream_seq', 0)
+st.session_state.setdefault('_tables_version', 0)
+# setdefault evaluates its default eagerly, so only build these when absent
 if 'nlp' not in st.session_state:
     st.session_state.nlp = NaturalLanguageProcessor()
-if 'chat_history' not in st.session_state:
-    st.session_state.chat_history = []
-if 'bedrock_region' not in st.session_state:
-    st.session_state.bedrock_region = 'us-east-1'
+if '_default_ids' not in st.session_state:
+    st.session_state._default_ids = {table: f"{prefix}{random.randint(100,999)}" for table, prefix in _ID_PREFIXES.items()}
 
 # Sample data for different tables
 TABLE_SAMPLES = {
@@ -582,28 +876,75 @@ TABLE_SAMPLES = {
     ]
 }
 
+# Sample table schemas
+TABLE_CONFIGS = {
+    "users": {"partition_key": "user_id"},
+    "products": {"partition_key": "product_id"},
+    "orders": {"partition_key": "order_id"},
+    "reviews": {"partition_key": "review_id"},
+    "inventory": {"partition_key": "item_id"}
+}
+
+# Table-specific query conditions
+QUERY_CONDITIONS = {
+    'users': ("age > 30", "city = 'San Francisco'", "user_id = 'u001'", "age < 25"),
+    'products': ("category = 'electronics'", "price > 100", "product_id = 'p001'", "rating > 4.0"),
+    'orders': ("status = 'pending'", "user_id = 'u001'", "order_id = 'o001'", "total > 500"),
+    'reviews': ("rating > 4", "product_id = 'p001'", "review_id = 'r001'", "rating = 5"),
+    'inventory': ("quantity < 50", "warehouse = 'west'", "item_id = 'i001'", "quantity = 0")
+}
+
+# Table-specific scan filters
+SCAN_FILTERS = {
+    'users': ("", "age > 25", "city = 'New York'", "name contains 'John'"),
+    'products': ("", "price < 100", "category = 'electronics'", "rating > 4.5"),
+    'orders': ("", "status = 'delivered'", "total > 100", "quantity > 1"),
+    'reviews': ("", "rating >= 4", "comment contains 'great'", "date > '2024-01-01'"),
+    'inventory': ("", "quantity > 0", "warehouse = 'east'", "last_updated > '2024-01-01'")
+}
+
+# Table-specific test queries for the partition key optimizer
+TEST_QUERIES = {
+    'users': "age > 30 AND city = 'San Francisco'",
+    'products': "category = 'electronics' AND price > 100",
+    'orders': "status = 'pending' AND total > 500",
+    'reviews': "rating > 4 AND date > '2024-01-01'",
+    'inventory': "warehouse = 'west' AND quantity < 50"
+}
+
+# Table-specific stream operations
+STREAM_OPERATIONS = {
+    'users': ('User Registration', 'Profile Update', 'Login Event'),
+    'products': ('Product Launch', 'Price Change', 'Inventory Update'),
+    'orders': ('Order Placed', 'Status Change', 'Payment Processed'),
+    'reviews': ('Review Posted', 'Rating Updated', 'Comment Modified'),
+    'inventory': ('Stock Replenished', 'Item Moved', 'Quantity Adjusted')
+}
+
 # Initialize enhanced MCP tools
 mcp_tools = EnhancedMCPDynamoDBTools()
 
+# Sample tables are built once per process; every session gets its own copy
+@st.cache_resource(show_spinner=False)
+def _seed_tables() -> Dict[str, Dict]:
+    """Build the sample tables directly, without replaying put_item per item"""
+    tables = {}
+    for table_name, schema in TABLE_CONFIGS.items():
+        table = _new_table(schema)
+        key_field = schema["partition_key"]
+        for item in TABLE_SAMPLES.get(table_name, []):
+            table["items"][item[key_field]] = item
+        tables[table_name] = table
+    return tables
+
 # Initialize sample tables and data
 def initialize_sample_data():
     if not st.session_state.initialized:
-        # Create 5 tables with different schemas
-        table_configs = {
-            "users": {"partition_key": "user_id"},
-            "products": {"partition_key": "product_id"},
-            "orders": {"partition_key": "order_id"},
-            "reviews": {"partition_key": "review_id"},
-            "inventory": {"partition_key": "item_id"}
-        }
-        
-        for table_name, schema in table_configs.items():
-            mcp_tools.create_table(table_name, schema)
-            
-            # Add sample data
-            if table_name in TABLE_SAMPLES:
-                for item in TABLE_SAMPLES[table_name]:
-                    mcp_tools.put_item(table_name, item)
+        st.session_state.tables = copy.deepcopy(_seed_tables())
+        for table in st.session_state.tables.values():
+            table["created_at"] = _RERUN_NOW
+        st.session_state.current_table = next(reversed(st.session_state.tables))
+        st.session_state._tables_version += 1
         
         # Perform some sample operations for analysis
         mcp_tools.query("users", "age > 30")
@@ -615,6 +956,219 @@ def initialize_sample_data():
 
 initialize_sample_data()
 
+def _draw_default_id(table_name: str):
+    """Draw a fresh default ID for a table's Put Item form"""
+    st.session_state._default_ids[table_name] = f"{_ID_PREFIXES[table_name]}{random.randint(100,999)}"
+
+def _reset_all_data():
+    """Drop all tables, costs and chat before the rerun, which then reseeds the sample data"""
+    st.session_state.tables = {}
+    st.session_state.current_table = None
+    st.session_state.mcp_costs = {"total": 0.0, "operations": 0}
+    st.session_state.initialized = False
+    st.session_state.chat_history = []
+
+# Put Item form fields per table: one tuple of (attribute, widget, label, kwargs) per column.
+# A callable "value" is evaluated at render time; attribute None marks a non-field widget.
+FORM_SCHEMAS = {
+    "users": (
+        (
+            ("user_id", "text", "User ID:", {"value": lambda: st.session_state._default_ids["users"]}),
+            (None, "button", "🎲 New ID", {"on_click": _draw_default_id, "args": ("users",)}),
+            ("name", "text", "Name:", {"value": "John Doe"}),
+            ("email", "text", "Email:", {"value": "john@example.com"})
+        ),
+        (
+            ("age", "number", "Age:", {"min_value": 18, "max_value": 100, "value": 30}),
+            ("city", "text", "City:", {"value": "San Francisco"})
+        )
+    ),
+    "products": (
+        (
+            ("product_id", "text", "Product ID:", {"value": lambda: st.session_state._default_ids["products"]}),
+            ("name", "text", "Name:", {"value": "New Product"}),
+            ("category", "select", "Category:", {"options": ("electronics", "clothing", "books", "home")})
+        ),
+        (
+            ("price", "number", "Price:", {"min_value": 0.01, "value": 99.99}),
+            ("rating", "slider", "Rating:", {"min_value": 1.0, "max_value": 5.0, "value": 4.0, "step": 0.1})
+        )
+    ),
+    "orders": (
+        (
+            ("order_id", "text", "Order ID:", {"value": lambda: st.session_state._default_ids["orders"]}),
+            ("user_id", "text", "User ID:", {"value": "u001"}),
+            ("product_id", "text", "Product ID:", {"value": "p001"})
+        ),
+        (
+            ("quantity", "number", "Quantity:", {"min_value": 1, "value": 1}),
+            ("total", "number", "Total:", {"min_value": 0.01, "value": 99.99}),
+            ("status", "select", "Status:", {"options": ("pending", "shipped", "delivered", "cancelled")})
+        )
+    ),
+    "reviews": (
+        (
+            ("review_id", "text", "Review ID:", {"value": lambda: st.session_state._default_ids["reviews"]}),
+            ("product_id", "text", "Product ID:", {"value": "p001"}),
+            ("user_id", "text", "User ID:", {"value": "u001"})
+        ),
+        (
+            ("rating", "slider", "Rating:", {"min_value": 1, "max_value": 5, "value": 4}),
+            ("comment", "text_area", "Comment:", {"value": "Great product!"}),
+            ("date", "date", "Date:", {"value": _RERUN_TODAY})
+        )
+    ),
+    "inventory": (
+        (
+            ("item_id", "text", "Item ID:", {"value": lambda: st.session_state._default_ids["inventory"]}),
+            ("product_id", "text", "Product ID:", {"value": "p001"}),
+            ("warehouse", "select", "Warehouse:", {"options": ("west", "east", "central", "north", "south")})
+        ),
+        (
+            ("quantity", "number", "Quantity:", {"min_value": 0, "value": 100}),
+            ("last_updated", "date", "Last Updated:", {"value": _RERUN_TODAY})
+        )
+    )
+}
+
+# Form widget kind -> Streamlit widget
+_FORM_WIDGETS = {
+    "text": st.text_input,
+    "text_area": st.text_area,
+    "number": st.number_input,
+    "select": st.selectbox,
+    "slider": st.slider,
+    "date": st.date_input,
+    "button": st.button
+}
+
+def render_form(schema) -> Dict[str, Any]:
+    """Render a Put Item form from its field schema and return the assembled item"""
+    item = {}
+    for column, fields in zip(st.columns(len(schema)), schema):
+        with column:
+            for attr, widget, label, kwargs in fields:
+                if callable(kwargs.get("value")):
+                    kwargs = {**kwargs, "value": kwargs["value"]()}
+                value = _FORM_WIDGETS[widget](label, **kwargs)
+                if attr is not None:
+                    item[attr] = str(value) if widget == "date" else value
+    return item
+
+def _tables_overview_df() -> pd.DataFrame:
+    """Table overview rows, rebuilt only after a table is created or its items change"""
+    cached = st.session_state.get('_tables_overview')
+    if cached is None or cached[0] != st.session_state._tables_version:
+        df = pd.DataFrame([
+            {
+                "Table Name": table_name,
+                "Items": len(table_data["items"]),
+                "Partition Key": table_data["key_schema"]["partition_key"],
+                "Created": table_data["created_at"].strftime("%H:%M:%S")
+            }
+            for table_name, table_data in st.session_state.tables.items()
+        ])
+        cached = (st.session_state._tables_version, df)
+        st.session_state._tables_overview = cached
+    return cached[1]
+
+# Only the latest few assistant results get a JSON expander
+_CHAT_RESULT_EXPANDERS = 3
+
+# Markdown syntax characters; escaped in message text so one message cannot reformat the rest
+_MARKDOWN_SPECIAL_RE = re.compile(r"([\\`*_{}\[\]()#+\-.!|~<>])")
+
+def _chat_markdown() -> str:
+    """Chat transcript as one Markdown blob, extended only by messages added since the last rerun"""
+    history = st.session_state.chat_history
+    owner, count, md = st.session_state.get('_chat_md', (None, 0, ""))
+    # The cache holds the list itself: a cleared history is a new list, even if it reuses the old id
+    if owner is not history or count > len(history):
+        count, md = 0, ""
+    if count < len(history):
+        new = [
+            ("**You:** " if msg['type'] == 'user' else "**Assistant:** ")
+            + _MARKDOWN_SPECIAL_RE.sub(r"\\\1", msg['content'])
+            for msg in history[count:]
+        ]
+        md = "\n\n".join([md, *new] if md else new)
+        st.session_state._chat_md = (history, len(history), md)
+    return md
+
+def _recent_chat_results() -> List[Tuple[int, Dict]]:
+    """(message number, message) for the latest assistant messages carrying a result, oldest first"""
+    history = st.session_state.chat_history
+    recent = []
+    for i in range(len(history) - 1, -1, -1):
+        if len(recent) == _CHAT_RESULT_EXPANDERS:
+            break
+        if 'result_json' in history[i]:
+            recent.append((i + 1, history[i]))
+    return recent[::-1]
+
+# Example requests offered as one-click chat buttons
+EXAMPLES = (
+    "Get user with id u001",
+    "List all products",
+    "Create a new user",
+    "Update user u002 set name=Alice",
+    "Delete product p003",
+    "Show me all orders",
+    "Find items where category electronics"
+)
+
+# Parsed NL action -> (MCP tool call, chat response template)
+ACTION_DISPATCH = {
+    'get_item': (lambda a: mcp_tools.get_item(a['table_name'], a['key']), "Retrieved item from {table}"),
+    'put_item': (lambda a: mcp_tools.put_item(a['table_name'], a['item']), "Created new item in {table}"),
+    'update_item': (lambda a: mcp_tools.update_item(a['table_name'], a['key'], a['updates']), "Updated item in {table}"),
+    'delete_item': (lambda a: mcp_tools.delete_item(a['table_name'], a['key']), "Deleted item from {table}"),
+    'scan': (lambda a: mcp_tools.scan(a['table_name'], None), "Scanned {table} - found {found} items"),
+    'query': (lambda a: mcp_tools.query(a['table_name'], a['key_condition']), "Queried {table} - found {found} items")
+}
+
+def _run_action(action: Dict) -> Tuple[str, Optional[Dict]]:
+    """Execute a parsed NL action through the MCP tools; returns (response, result)"""
+    if action['action'] in ['unknown', 'error']:
+        return action.get('message', 'Could not understand request'), None
+    
+    handler = ACTION_DISPATCH.get(action['action'])
+    if handler is None:
+        return "Action not supported yet", None
+    
+    tool, response = handler
+    try:
+        result = tool(action)
+    except Exception as e:
+        return f"Error executing action: {str(e)}", None
+    if not result.get('success', True):
+        return f"Error: {result['error']}", result
+    return response.format(table=action['table_name'], found=len(result.get('items', []))), result
+
+def _handle_chat_request(text: str, table_name: str):
+    """Parse a chat request, run it and record both sides of the exchange"""
+    st.session_state.chat_history.append({
+        'type': 'user',
+        'content': text,
+        'timestamp': _RERUN_ISO
+    })
+    
+    action = st.session_state.nlp.parse_request(text, table_name)
+    st.markdown(f"**🔍 Parsed Action:** `{action}`")
+    response, result = _run_action(action)
+    
+    assistant_msg = {
+        'type': 'assistant',
+        'content': response,
+        'timestamp': _RERUN_ISO
+    }
+    if result:
+        result.pop('items_df', None)  # Shown as the items list; the frame adds nothing to the JSON
+        assistant_msg['result_json'] = _json_dumps(result)  # Encoded once, re-rendered every rerun
+    
+    st.session_state.chat_history.append(assistant_msg)
+    st.rerun()
+
 # Header
 st.title("DynamoDB Operations Through MCP")
 st.markdown("**With DynamoDB-Specific Extensions: Partition Key Optimizer, Capacity Planner, Stream Event Adapter, Index Advisor**")
@@ -692,17 +1246,7 @@ with tab1:
     if st.session_state.tables:
         st.markdown("### 📊 Existing Tables")
         
-        table_df = []
-        for table_name, table_data in st.session_state.tables.items():
-            table_df.append({
-                "Table Name": table_name,
-                "Items": len(table_data["items"]),
-                "Partition Key": table_data["key_schema"]["partition_key"],
-                "Created": table_data["created_at"].strftime("%H:%M:%S")
-            })
-        
-        df = pd.DataFrame(table_df)
-        st.dataframe(df, use_container_width=True)
+        st.dataframe(_tables_overview_df(), use_container_width=True)
         
         st.markdown("---")
     
@@ -756,63 +1300,8 @@ with tab2:
         st.markdown("### Put Item")
         
         # Dynamic form based on table
-        if selected_table == "users":
-            col1, col2 = st.columns(2)
-            with col1:
-                user_id = st.text_input("User ID:", value=f"u{random.randint(100,999)}")
-                name = st.text_input("Name:", value="John Doe")
-                email = st.text_input("Email:", value="john@example.com")
-            with col2:
-                age = st.number_input("Age:", min_value=18, max_value=100, value=30)
-                city = st.text_input("City:", value="San Francisco")
-            item = {"user_id": user_id, "name": name, "email": email, "age": age, "city": city}
-        
-        elif selected_table == "products":
-            col1, col2 = st.columns(2)
-            with col1:
-                product_id = st.text_input("Product ID:", value=f"p{random.randint(100,999)}")
-                name = st.text_input("Name:", value="New Product")
-                category = st.selectbox("Category:", ["electronics", "clothing", "books", "home"])
-            with col2:
-                price = st.number_input("Price:", min_value=0.01, value=99.99)
-                rating = st.slider("Rating:", 1.0, 5.0, 4.0, 0.1)
-            item = {"product_id": product_id, "name": name, "category": category, "price": price, "rating": rating}
-        
-        elif selected_table == "orders":
-            col1, col2 = st.columns(2)
-            with col1:
-                order_id = st.text_input("Order ID:", value=f"o{random.randint(100,999)}")
-                user_id = st.text_input("User ID:", value="u001")
-                product_id = st.text_input("Product ID:", value="p001")
-            with col2:
-                quantity = st.number_input("Quantity:", min_value=1, value=1)
-                total = st.number_input("Total:", min_value=0.01, value=99.99)
-                status = st.selectbox("Status:", ["pending", "shipped", "delivered", "cancelled"])
-            item = {"order_id": order_id, "user_id": user_id, "product_id": product_id, "quantity": quantity, "total": total, "status": status}
-        
-        elif selected_table == "reviews":
-            col1, col2 = st.columns(2)
-            with col1:
-                review_id = st.text_input("Review ID:", value=f"r{random.randint(100,999)}")
-                product_id = st.text_input("Product ID:", value="p001")
-                user_id = st.text_input("User ID:", value="u001")
-            with col2:
-                rating = st.slider("Rating:", 1, 5, 4)
-                comment = st.text_area("Comment:", value="Great product!")
-                date = st.date_input("Date:", value=datetime.now().date())
-            item = {"review_id": review_id, "product_id": product_id, "user_id": user_id, "rating": rating, "comment": comment, "date": str(date)}
-        
-        elif selected_table == "inventory":
-            col1, col2 = st.columns(2)
-            with col1:
-                item_id = st.text_input("Item ID:", value=f"i{random.randint(100,999)}")
-                product_id = st.text_input("Product ID:", value="p001")
-                warehouse = st.selectbox("Warehouse:", ["west", "east", "central", "north", "south"])
-            with col2:
-                quantity = st.number_input("Quantity:", min_value=0, value=100)
-                last_updated = st.date_input("Last Updated:", value=datetime.now().date())
-            item = {"item_id": item_id, "product_id": product_id, "warehouse": warehouse, "quantity": quantity, "last_updated": str(last_updated)}
-        
+        if selected_table in FORM_SCHEMAS:
+            item = render_form(FORM_SCHEMAS[selected_table])
         else:
             st.warning("Unknown table schema")
             item = {}
@@ -830,10 +1319,13 @@ with tab2:
             
             if result["success"]:
                 st.success(f"✅ Item added with key: {result['item_key']}")
+                # The next form starts from a fresh ID instead of overwriting this item
+                if result['item_key'] == st.session_state._default_ids.get(selected_table):
+                    _draw_default_id(selected_table)
                 
                 # Show stream event
                 with st.expander("📡 Generated Stream Event for AI"):
-                    st.json(result["ai_payload"])
+                    st.code(_json_dumps(result["ai_payload"]), language="json")
                     st.info("This event can be processed by AI workflows for real-time personalization")
             else:
                 st.error(f"❌ Error: {result['error']}")
@@ -841,9 +1333,8 @@ with tab2:
         # Quick add sample data
         if st.button("🚀 Add Sample Data", use_container_width=True):
             if selected_table in TABLE_SAMPLES:
-                for item in TABLE_SAMPLES[selected_table]:
-                    mcp_tools.put_item(selected_table, item)
-                st.success(f"✅ Added sample items to {selected_table} with stream events")
+                result = mcp_tools.batch_write_item(selected_table, TABLE_SAMPLES[selected_table])
+                st.success(f"✅ Added {result['count']} sample items to {selected_table} in {result['batch_calls']} batch write call(s)")
             else:
                 st.warning("No sample data available for this table")
 
@@ -862,16 +1353,7 @@ with tab3:
         # Query
         st.markdown("### Query Operation")
         
-        # Table-specific query conditions
-        query_conditions = {
-            'users': ["age > 30", "city = 'San Francisco'", "user_id = 'u001'", "age < 25"],
-            'products': ["category = 'electronics'", "price > 100", "product_id = 'p001'", "rating > 4.0"],
-            'orders': ["status = 'pending'", "user_id = 'u001'", "order_id = 'o001'", "total > 500"],
-            'reviews': ["rating > 4", "product_id = 'p001'", "review_id = 'r001'", "rating = 5"],
-            'inventory': ["quantity < 50", "warehouse = 'west'", "item_id = 'i001'", "quantity = 0"]
-        }
-        
-        query_condition = st.selectbox("Query Condition:", query_conditions.get(query_table, ["No conditions available"]))
+        query_condition = st.selectbox("Query Condition:", QUERY_CONDITIONS.get(query_table, ("No conditions available",)))
         
         if st.button("🔍 Query via MCP", use_container_width=True):
             result = mcp_tools.query(query_table, query_condition)
@@ -887,8 +1369,7 @@ with tab3:
             if result["success"]:
                 st.success(f"✅ Query returned {result['count']} items (scanned {result.get('scanned_count', 0)})")
                 if result["items"]:
-                    df = pd.DataFrame(result["items"])
-                    st.dataframe(df, use_container_width=True)
+                    st.dataframe(result["items_df"], use_container_width=True)
                 
                 # Show optimization analysis
                 if "optimization_analysis" in result:
@@ -917,16 +1398,7 @@ with tab3:
         # Scan
         st.markdown("### Scan Operation")
         
-        # Table-specific scan filters
-        scan_filters = {
-            'users': ["", "age > 25", "city = 'New York'", "name contains 'John'"],
-            'products': ["", "price < 100", "category = 'electronics'", "rating > 4.5"],
-            'orders': ["", "status = 'delivered'", "total > 100", "quantity > 1"],
-            'reviews': ["", "rating >= 4", "comment contains 'great'", "date > '2024-01-01'"],
-            'inventory': ["", "quantity > 0", "warehouse = 'east'", "last_updated > '2024-01-01'"]
-        }
-        
-        scan_filter = st.selectbox("Filter Expression:", scan_filters.get(query_table, [""]))
+        scan_filter = st.selectbox("Filter Expression:", SCAN_FILTERS.get(query_table, ("",)))
         
         if st.button("📊 Scan Table via MCP", use_container_width=True):
             result = mcp_tools.scan(query_table, scan_filter if scan_filter else None)
@@ -942,8 +1414,7 @@ with tab3:
             if result["success"]:
                 st.success(f"✅ Scan returned {result['count']} items")
                 if result["items"]:
-                    df = pd.DataFrame(result["items"])
-                    st.dataframe(df, use_container_width=True)
+                    st.dataframe(result["items_df"], use_container_width=True)
                 
                 # Show scan warnings
                 if "optimization_analysis" in result:
@@ -974,25 +1445,8 @@ with tab4:
         # Partition Key Optimizer
         st.markdown("### 1. 🎯 Partition Key Optimizer")
         
-        # Table-specific test queries and partition keys
-        test_queries = {
-            'users': "age > 30 AND city = 'San Francisco'",
-            'products': "category = 'electronics' AND price > 100",
-            'orders': "status = 'pending' AND total > 500",
-            'reviews': "rating > 4 AND date > '2024-01-01'",
-            'inventory': "warehouse = 'west' AND quantity < 50"
-        }
-        
-        partition_keys = {
-            'users': 'user_id',
-            'products': 'product_id', 
-            'orders': 'order_id',
-            'reviews': 'review_id',
-            'inventory': 'item_id'
-        }
-        
-        test_query = st.text_input("Test Query Pattern:", value=test_queries.get(analysis_table, "test query"))
-        pk_field = partition_keys.get(analysis_table, 'id')
+        test_query = st.text_input("Test Query Pattern:", value=TEST_QUERIES.get(analysis_table, "test query"))
+        pk_field = TABLE_CONFIGS.get(analysis_table, {}).get("partition_key", 'id')
         uses_pk = st.checkbox(f"Query uses partition key ({pk_field})", value=False)
         
         if st.button("🔍 Analyze Query Efficiency", use_container_width=True):
@@ -1012,7 +1466,8 @@ with tab4:
         st.markdown("### 2. 📊 Capacity Planner")
         
         if st.session_state.mcp_costs['operations'] > 0:
-            capacity_analysis = mcp_tools.extensions.capacity_planner("analysis", 1.0)
+            usage = mcp_tools.extensions.capacity_usage
+            capacity_analysis = _cached_capacity_report(usage["RCU"], usage["WCU"], st.session_state.mcp_costs['operations'])
             
             cap_col1, cap_col2 = st.columns(2)
             
@@ -1038,18 +1493,9 @@ with tab4:
         st.markdown("### 3. 🔄 Stream Event Adapter")
         
         if st.session_state.tables[analysis_table]['items']:
-            sample_item = list(st.session_state.tables[analysis_table]['items'].values())[0]
+            sample_item = next(iter(st.session_state.tables[analysis_table]['items'].values()))
             
-            # Table-specific stream operations
-            stream_operations = {
-                'users': ['User Registration', 'Profile Update', 'Login Event'],
-                'products': ['Product Launch', 'Price Change', 'Inventory Update'],
-                'orders': ['Order Placed', 'Status Change', 'Payment Processed'],
-                'reviews': ['Review Posted', 'Rating Updated', 'Comment Modified'],
-                'inventory': ['Stock Replenished', 'Item Moved', 'Quantity Adjusted']
-            }
-            
-            selected_operation = st.selectbox("Stream Operation Type:", stream_operations.get(analysis_table, ['MODIFY']))
+            selected_operation = st.selectbox("Stream Operation Type:", STREAM_OPERATIONS.get(analysis_table, ('MODIFY',)))
             
             if st.button("🎬 Generate Stream Event for AI", use_container_width=True):
                 stream_data = mcp_tools.extensions.stream_event_adapter(selected_operation, sample_item)
@@ -1058,11 +1504,11 @@ with tab4:
                 
                 with stream_col1:
                     st.markdown("**📡 DynamoDB Stream Event:**")
-                    st.json(stream_data["stream_event"])
+                    st.code(_json_dumps(stream_data["stream_event"]), language="json")
                 
                 with stream_col2:
                     st.markdown("**🤖 AI-Ready Payload:**")
-                    st.json(stream_data["ai_payload"])
+                    st.code(_json_dumps(stream_data["ai_payload"]), language="json")
                 
                 st.markdown("**🔧 Processing Recommendations:**")
                 for rec in stream_data["processing_recommendations"]:
@@ -1083,7 +1529,7 @@ with tab4:
             # Show query patterns
             if table_data['query_patterns']:
                 st.markdown("**Query Patterns:**")
-                for i, pattern in enumerate(table_data['query_patterns'][-3:]):
+                for i, pattern in enumerate(_latest(table_data['query_patterns'])):
                     with st.expander(f"Query {i+1}: {pattern['pattern'][:50]}..."):
                         st.write(f"**Uses Partition Key:** {'✅' if pattern['uses_pk'] else '❌'}")
                         st.write(f"**Pattern:** {pattern['pattern']}")
@@ -1092,7 +1538,7 @@ with tab4:
             # Show scan operations
             if table_data['scan_operations']:
                 st.markdown("**Scan Operations:**")
-                for i, scan in enumerate(table_data['scan_operations'][-3:]):
+                for i, scan in enumerate(_latest(table_data['scan_operations'])):
                     with st.expander(f"Scan {i+1}: {scan['pattern'][:50]}..."):
                         st.write(f"**Items Scanned:** {scan['scan_ratio']}")
                         st.write(f"**Pattern:** {scan['pattern']}")
@@ -1101,11 +1547,7 @@ with tab4:
             # Get latest analysis
             if mcp_tools.extensions.scan_operations:
                 latest_op = mcp_tools.extensions.scan_operations[-1]
-                analysis = mcp_tools.extensions.index_advisor(
-                    latest_op['pattern'], 
-                    latest_op['filter_attributes'], 
-                    5, 10  # Sample values
-                )
+                analysis = _cached_index_report(latest_op['filter_attributes'], 5, 10)  # Sample values
                 
                 st.markdown("**🎯 Index Recommendations:**")
                 
@@ -1135,13 +1577,13 @@ with tab5:
     
     # Region selection
     region = st.selectbox("AWS Region:", ['us-east-1', 'us-west-2', 'eu-west-1'], index=0)
-    if region != st.session_state.bedrock_region:
-        st.session_state.bedrock_region = region
-        st.session_state.nlp.set_credentials(region)
     
-    # Initialize Bedrock
+    # Initialize Bedrock only on first use or when the region changes
     try:
-        st.session_state.nlp.set_credentials(region)
+        nlp = st.session_state.nlp
+        if nlp.bedrock is None or region != st.session_state.bedrock_region:
+            nlp.set_credentials(region)
+            st.session_state.bedrock_region = region
         st.success("✅ Bedrock client initialized")
     except Exception as e:
         st.error(f"❌ Bedrock initialization failed: {str(e)}")
@@ -1163,147 +1605,23 @@ with tab5:
     # Chat history display
     chat_container = st.container(height=400)
     with chat_container:
-        for i, msg in enumerate(st.session_state.chat_history):
-            if msg['type'] == 'user':
-                st.markdown(f"**You:** {msg['content']}")
-            else:
-                st.markdown(f"**Assistant:** {msg['content']}")
-                if 'result' in msg:
-                    with st.expander("View Result", expanded=False):
-                        st.json(msg['result'])
+        if st.session_state.chat_history:
+            st.markdown(_chat_markdown())
+        for n, msg in _recent_chat_results():
+            with st.expander(f"View Result #{n}", expanded=False):
+                st.code(msg['result_json'], language="json")
     
     # Chat input
     user_input = st.chat_input("Type your request... (e.g., 'Get user with id u001', 'List all products', 'Create a new user')")
     
     if user_input:
-        # Add user message to history
-        st.session_state.chat_history.append({
-            'type': 'user',
-            'content': user_input,
-            'timestamp': datetime.now().isoformat()
-        })
-        
-        # Process the request
-        action = st.session_state.nlp.parse_request(user_input, chat_table)
-        
-        # Display parsed action
-        st.markdown(f"**🔍 Parsed Action:** `{action}`")
-        
-        if action['action'] in ['unknown', 'error']:
-            response = action.get('message', 'Could not understand request')
-            result = None
-        else:
-            # Execute the action
-            try:
-                if action['action'] == 'get_item':
-                    result = mcp_tools.get_item(action['table_name'], action['key'])
-                    response = f"Retrieved item from {action['table_name']}"
-                
-                elif action['action'] == 'put_item':
-                    result = mcp_tools.put_item(action['table_name'], action['item'])
-                    response = f"Created new item in {action['table_name']}"
-                
-                elif action['action'] == 'update_item':
-                    result = mcp_tools.update_item(action['table_name'], action['key'], action['updates'])
-                    response = f"Updated item in {action['table_name']}"
-                
-                elif action['action'] == 'delete_item':
-                    result = mcp_tools.delete_item(action['table_name'], action['key'])
-                    response = f"Deleted item from {action['table_name']}"
-                
-                elif action['action'] == 'scan':
-                    result = mcp_tools.scan(action['table_name'], None)
-                    response = f"Scanned {action['table_name']} - found {len(result.get('items', []))} items"
-                
-                elif action['action'] == 'query':
-                    result = mcp_tools.query(action['table_name'], action['key_condition'])
-                    response = f"Queried {action['table_name']} - found {len(result.get('items', []))} items"
-                
-                else:
-                    response = "Action not supported yet"
-                    result = None
-            
-            except Exception as e:
-                response = f"Error executing action: {str(e)}"
-                result = None
-        
-        # Add assistant response to history
-        assistant_msg = {
-            'type': 'assistant',
-            'content': response,
-            'timestamp': datetime.now().isoformat()
-        }
-        if result:
-            assistant_msg['result'] = result
-        
-        st.session_state.chat_history.append(assistant_msg)
-        st.rerun()
+        _handle_chat_request(user_input, chat_table)
     
     # Example requests
     st.subheader("💡 Example Requests")
-    examples = [
-        "Get user with id u001",
-        "List all products",
-        "Create a new user",
-        "Update user u002 set name=Alice",
-        "Delete product p003",
-        "Show me all orders",
-        "Find items where category electronics"
-    ]
-    
-    for example in examples:
-        if st.button(example, key=f"example_{hash(example)}", use_container_width=True):
-            # Add user message
-            st.session_state.chat_history.append({
-                'type': 'user',
-                'content': example,
-                'timestamp': datetime.now().isoformat()
-            })
-            
-            # Process immediately
-            action = st.session_state.nlp.parse_request(example, chat_table)
-            
-            if action['action'] in ['unknown', 'error']:
-                response = action.get('message', 'Could not understand request')
-                result = None
-            else:
-                try:
-                    if action['action'] == 'get_item':
-                        result = mcp_tools.get_item(action['table_name'], action['key'])
-                        response = f"Retrieved item from {action['table_name']}"
-                    elif action['action'] == 'put_item':
-                        result = mcp_tools.put_item(action['table_name'], action['item'])
-                        response = f"Created new item in {action['table_name']}"
-                    elif action['action'] == 'update_item':
-                        result = mcp_tools.update_item(action['table_name'], action['key'], action['updates'])
-                        response = f"Updated item in {action['table_name']}"
-                    elif action['action'] == 'delete_item':
-                        result = mcp_tools.delete_item(action['table_name'], action['key'])
-                        response = f"Deleted item from {action['table_name']}"
-                    elif action['action'] == 'scan':
-                        result = mcp_tools.scan(action['table_name'], None)
-                        response = f"Scanned {action['table_name']} - found {len(result.get('items', []))} items"
-                    elif action['action'] == 'query':
-                        result = mcp_tools.query(action['table_name'], action['key_condition'])
-                        response = f"Queried {action['table_name']} - found {len(result.get('items', []))} items"
-                    else:
-                        response = "Action not supported"
-                        result = None
-                except Exception as e:
-                    response = f"Error: {str(e)}"
-                    result = None
-            
-            # Add response
-            assistant_msg = {
-                'type': 'assistant',
-                'content': response,
-                'timestamp': datetime.now().isoformat()
-            }
-            if result:
-                assistant_msg['result'] = result
-            
-            st.session_state.chat_history.append(assistant_msg)
-            st.rerun()
+    for i, example in enumerate(EXAMPLES):
+        if st.button(example, key=f"ex_{i}", use_container_width=True):
+            _handle_chat_request(example, chat_table)
 
 # Operation Summary
 if st.session_state.mcp_costs['operations'] > 0:
@@ -1323,19 +1641,8 @@ if st.session_state.mcp_costs['operations'] > 0:
         st.metric("Avg Cost/Op", f"${avg_cost:.4f}")
     
     with summary_col4:
-        extensions_used = len([x for x in [
-            mcp_tools.extensions.query_patterns,
-            mcp_tools.extensions.scan_operations
-        ] if x])
+        extensions_used = bool(mcp_tools.extensions.query_patterns) + bool(mcp_tools.extensions.scan_operations)
         st.metric("Extensions Used", extensions_used)
 
 # Reset button
-if st.button("🔄 Reset All Data", use_container_width=True):
-    st.session_state.tables = {}
-    st.session_state.current_table = None
-    st.session_state.mcp_costs = {"total": 0.0, "operations": 0}
-    st.session_state.initialized = False
-    # Reset extensions and chat
-    mcp_tools.extensions = DynamoDBExtensions()
-    st.session_state.chat_history = []
-    st.rerun()
\ No newline at end of file
+st.button("🔄 Reset All Data", use_container_width=True, on_click=_reset_all_data)
\ No newline at end of file
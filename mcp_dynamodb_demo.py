@@ -6,17 +6,16 @@ Interactive demonstration of all essential DynamoDB operations via MCP tools
 
 import streamlit as st
 import json
-import boto3
 import random
 from datetime import datetime, timedelta
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Sequence, ClassVar
 import pandas as pd
 
 # Page config
 st.set_page_config(page_title="DynamoDB MCP Operations", page_icon="🗄️", layout="wide")
 
 # CSS
-st.markdown("""
+_CSS = """
 <style>
 .operation-card {
     background: var(--background-color);
@@ -51,16 +50,62 @@ st.markdown("""
     margin: 10px 0;
 }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+# Sidebar server status card
+_MCP_STATUS_HTML = """<div class="mcp-tool">
+    <strong>DynamoDB MCP Server</strong><br>
+    Status: 🟢 Active<br>
+    Tools: 8 available
+</div>"""
+
+# Result card templates, filled with str.format on each tool call
+MCP_TOOL_TMPL = """<div class="mcp-tool">
+    MCP Tool: {tool}()<br>
+    Parameters: {params}<br>
+    Cost: ${cost:.4f}
+</div>"""
+
+TABLE_CREATED_TMPL = """<div class="success-result">
+    ✅ <strong>Table Created Successfully</strong><br>
+    Table: {table_name}<br>
+    Status: {status}<br>
+    Key Schema: {key_schema}
+</div>"""
+
+ERROR_TMPL = """<div class="error-result">
+    ❌ <strong>Error:</strong> {error}
+</div>"""
+
+# Streamlit drops elements a rerun does not re-emit, so the styles are sent on every run
+st.markdown(_CSS, unsafe_allow_html=True)
 
 # Sample data for operations
-SAMPLE_ITEMS = [
+SAMPLE_ITEMS = (
     {"user_id": "user001", "name": "Alice Johnson", "email": "alice@example.com", "age": 28, "city": "San Francisco"},
     {"user_id": "user002", "name": "Bob Smith", "email": "bob@example.com", "age": 35, "city": "New York"},
     {"user_id": "user003", "name": "Carol Davis", "email": "carol@example.com", "age": 42, "city": "Chicago"},
     {"user_id": "user004", "name": "David Wilson", "email": "david@example.com", "age": 31, "city": "Austin"},
     {"user_id": "user005", "name": "Eva Brown", "email": "eva@example.com", "age": 26, "city": "Seattle"}
-]
+)
+
+# DynamoDB BatchWriteItem accepts at most 25 put/delete requests per call
+BATCH_WRITE_LIMIT = 25
+
+# Value pools for generated batch items
+BATCH_AGES = range(20, 61)
+BATCH_CITIES = ("New York", "Los Angeles", "Chicago", "Houston")
+
+# Column dtypes for the items DataFrame; a fixed schema skips per-column inference
+ITEM_DTYPES = {"user_id": "string", "name": "string", "email": "string", "age": "Int16", "city": "string"}
+
+# Supported query key conditions -> NumPy bool mask over the items DataFrame.
+# Missing attributes never match; ages compare on the raw int16 buffer
+QUERY_PREDICATES = {
+    "age > 30": lambda df: df["age"].to_numpy(dtype="int16", na_value=0) > 30,
+    "city = 'San Francisco'": lambda df: (df["city"] == "San Francisco").to_numpy(dtype=bool, na_value=False),
+    "user_id begins_with 'user00'": lambda df: df["user_id"].str.startswith("user00").to_numpy(dtype=bool, na_value=False)
+}
 
 # Initialize session state
 if 'table_exists' not in st.session_state:
@@ -71,33 +116,74 @@ if 'operation_history' not in st.session_state:
     st.session_state.operation_history = []
 if 'mcp_costs' not in st.session_state:
     st.session_state.mcp_costs = {"total": 0.0, "operations": 0}
+if 'items_version' not in st.session_state:
+    st.session_state.items_version = 0  # Bumped on every write; invalidates cached item views
 
 # MCP Tool Simulator
 class MCPDynamoDBTools:
-    def __init__(self):
-        self.operation_costs = {
-            "create_table": 0.0,
-            "put_item": 0.00125,
-            "get_item": 0.00025,
-            "query": 0.00025,
-            "scan": 0.00025,
-            "update_item": 0.00125,
-            "delete_item": 0.00125,
-            "batch_write": 0.00125,
-            "batch_get": 0.00025
-        }
+    # Per-request costs, defined once with the class rather than per instance
+    operation_costs: ClassVar[Dict[str, float]] = {
+        "create_table": 0.0,
+        "put_item": 0.00125,
+        "get_item": 0.00025,
+        "query": 0.00025,
+        "scan": 0.00025,
+        "update_item": 0.00125,
+        "delete_item": 0.00125,
+        "batch_write": 0.00125,
+        "batch_get": 0.00025
+    }
+    
+    def _charge(self, cost: float):
+        """Record one tool call and its cost"""
+        costs = st.session_state.mcp_costs
+        costs["total"] += cost
+        costs["operations"] += 1
+    
+    def _items_changed(self):
+        """Invalidate cached views of table_items after a write"""
+        st.session_state.items_version += 1
+    
+    def _items_list(self) -> List[Dict]:
+        """All items as a list, rebuilt only when table_items has changed since the last call"""
+        ss = st.session_state
+        cached = ss.get('items_list_cache')
+        if cached is None or cached[0] != ss.items_version:
+            cached = (ss.items_version, list(ss.table_items.values()))
+            ss.items_list_cache = cached
+        return cached[1]
+    
+    def _items_frame(self) -> pd.DataFrame:
+        """Columnar view of table_items, rebuilt only when table_items has changed since the last call"""
+        ss = st.session_state
+        cached = ss.get('items_frame_cache')
+        if cached is None or cached[0] != ss.items_version:
+            df = pd.DataFrame.from_records(self._items_list(), columns=list(ITEM_DTYPES)).astype(ITEM_DTYPES)
+            cached = (ss.items_version, df)
+            ss.items_frame_cache = cached
+        return cached[1]
+    
+    def _read_cache(self) -> Dict:
+        """Memoized get_item/query results, valid until the next write"""
+        ss = st.session_state
+        cached = ss.get('read_cache')
+        if cached is None or cached[0] != ss.items_version:
+            cached = (ss.items_version, {})
+            ss.read_cache = cached
+        return cached[1]
     
     def create_table(self, table_name: str, key_schema: Dict) -> Dict:
         """MCP Tool: Create DynamoDB table"""
+        ss = st.session_state
         cost = self.operation_costs["create_table"]
-        st.session_state.mcp_costs["total"] += cost
-        st.session_state.mcp_costs["operations"] += 1
+        self._charge(cost)
         
-        if st.session_state.table_exists:
+        if ss.table_exists:
             return {"success": False, "error": "Table already exists", "cost": cost}
         
-        st.session_state.table_exists = True
-        st.session_state.table_items = {}
+        ss.table_exists = True
+        ss.table_items = {}
+        self._items_changed()
         
         return {
             "success": True,
@@ -109,15 +195,18 @@ class MCPDynamoDBTools:
     
     def put_item(self, table_name: str, item: Dict) -> Dict:
         """MCP Tool: Put item into DynamoDB"""
+        ss = st.session_state
         cost = self.operation_costs["put_item"]
-        st.session_state.mcp_costs["total"] += cost
-        st.session_state.mcp_costs["operations"] += 1
+        self._charge(cost)
         
-        if not st.session_state.table_exists:
+        if not ss.table_exists:
             return {"success": False, "error": "Table does not exist", "cost": cost}
         
-        item_key = item.get("user_id", f"item_{len(st.session_state.table_items)}")
-        st.session_state.table_items[item_key] = item
+        items = ss.table_items
+        # The fallback key is only formatted for items without a user_id, as in batch_write_item
+        item_key = item.get("user_id") or f"item_{len(items)}"
+        items[item_key] = item
+        self._items_changed()
         
         return {
             "success": True,
@@ -128,15 +217,19 @@ class MCPDynamoDBTools:
     
     def get_item(self, table_name: str, key: Dict) -> Dict:
         """MCP Tool: Get item from DynamoDB"""
+        ss = st.session_state
         cost = self.operation_costs["get_item"]
-        st.session_state.mcp_costs["total"] += cost
-        st.session_state.mcp_costs["operations"] += 1
+        self._charge(cost)
         
-        if not st.session_state.table_exists:
+        if not ss.table_exists:
             return {"success": False, "error": "Table does not exist", "cost": cost}
         
-        item_key = key.get("user_id")
-        item = st.session_state.table_items.get(item_key)
+        read_cache = self._read_cache()
+        cache_key = ("get", key.get("user_id"))
+        if cache_key in read_cache:
+            item = read_cache[cache_key]
+        else:
+            item = read_cache[cache_key] = ss.table_items.get(key.get("user_id"))
         
         if item:
             return {"success": True, "item": item, "cost": cost}
@@ -145,44 +238,56 @@ class MCPDynamoDBTools:
     
     def query(self, table_name: str, key_condition: str, filter_expression: str = None) -> Dict:
         """MCP Tool: Query DynamoDB table"""
+        ss = st.session_state
         cost = self.operation_costs["query"]
-        st.session_state.mcp_costs["total"] += cost
-        st.session_state.mcp_costs["operations"] += 1
+        self._charge(cost)
         
-        if not st.session_state.table_exists:
+        if not ss.table_exists:
             return {"success": False, "error": "Table does not exist", "cost": cost}
         
-        # Simulate query results
-        results = []
-        for item in st.session_state.table_items.values():
-            if "age > 30" in key_condition and item.get("age", 0) > 30:
-                results.append(item)
-            elif "city = 'San Francisco'" in key_condition and item.get("city") == "San Francisco":
-                results.append(item)
-            elif len(results) == 0:  # Return first item if no specific condition
-                results.append(item)
+        # One dispatch-table lookup per call; whitespace variants map to the same predicate
+        condition = " ".join(key_condition.split())
+        predicate = QUERY_PREDICATES.get(condition)
+        if predicate is None:
+            return {"success": False, "error": f"Unsupported key condition: {key_condition}", "cost": cost}
+        
+        read_cache = self._read_cache()
+        cache_key = ("query", condition)
+        if cache_key not in read_cache:
+            df = self._items_frame()
+            if df.empty:
+                read_cache[cache_key] = ([], None, 0)
+            else:
+                # Only the first 5 matches are materialized; the rest are just counted
+                positions = predicate(df).nonzero()[0]
+                first = positions[:5]  # Limit to 5 items
+                items = self._items_list()
+                read_cache[cache_key] = ([items[i] for i in first], df.iloc[first], len(positions))
+        results, results_df, count = read_cache[cache_key]
         
         return {
             "success": True,
-            "items": results[:5],  # Limit to 5 items
-            "count": len(results),
+            "items": results,
+            "items_df": results_df,
+            "count": count,
             "cost": cost
         }
     
     def scan(self, table_name: str, filter_expression: str = None) -> Dict:
         """MCP Tool: Scan DynamoDB table"""
+        ss = st.session_state
         cost = self.operation_costs["scan"]
-        st.session_state.mcp_costs["total"] += cost
-        st.session_state.mcp_costs["operations"] += 1
+        self._charge(cost)
         
-        if not st.session_state.table_exists:
+        if not ss.table_exists:
             return {"success": False, "error": "Table does not exist", "cost": cost}
         
-        items = list(st.session_state.table_items.values())
+        items = self._items_list()
         
         return {
             "success": True,
             "items": items,
+            "items_df": self._items_frame() if items else None,
             "count": len(items),
             "scanned_count": len(items),
             "cost": cost
@@ -190,24 +295,22 @@ class MCPDynamoDBTools:
     
     def update_item(self, table_name: str, key: Dict, update_expression: str, expression_values: Dict) -> Dict:
         """MCP Tool: Update item in DynamoDB"""
+        ss = st.session_state
         cost = self.operation_costs["update_item"]
-        st.session_state.mcp_costs["total"] += cost
-        st.session_state.mcp_costs["operations"] += 1
+        self._charge(cost)
         
-        if not st.session_state.table_exists:
+        if not ss.table_exists:
             return {"success": False, "error": "Table does not exist", "cost": cost}
         
-        item_key = key.get("user_id")
-        if item_key in st.session_state.table_items:
-            # Simple update simulation
-            item = st.session_state.table_items[item_key]
+        item = ss.table_items.get(key.get("user_id"))
+        if item is not None:
+            # Simple update simulation: each ":attr" placeholder named in the expression sets attr
             for attr, value in expression_values.items():
                 if attr.startswith(":"):
                     attr_name = attr[1:]  # Remove ':'
-                    if "age" in update_expression:
-                        item["age"] = value
-                    elif "city" in update_expression:
-                        item["city"] = value
+                    if attr_name in update_expression:
+                        item[attr_name] = value
+            self._items_changed()
             
             return {"success": True, "updated_item": item, "cost": cost}
         else:
@@ -215,43 +318,49 @@ class MCPDynamoDBTools:
     
     def delete_item(self, table_name: str, key: Dict) -> Dict:
         """MCP Tool: Delete item from DynamoDB"""
+        ss = st.session_state
         cost = self.operation_costs["delete_item"]
-        st.session_state.mcp_costs["total"] += cost
-        st.session_state.mcp_costs["operations"] += 1
+        self._charge(cost)
         
-        if not st.session_state.table_exists:
+        if not ss.table_exists:
             return {"success": False, "error": "Table does not exist", "cost": cost}
         
-        item_key = key.get("user_id")
-        if item_key in st.session_state.table_items:
-            deleted_item = st.session_state.table_items.pop(item_key)
+        deleted_item = ss.table_items.pop(key.get("user_id"), None)
+        if deleted_item is not None:
+            self._items_changed()
             return {"success": True, "deleted_item": deleted_item, "cost": cost}
         else:
             return {"success": False, "error": "Item not found", "cost": cost}
     
-    def batch_write_item(self, table_name: str, items: List[Dict]) -> Dict:
+    def batch_write_item(self, table_name: str, items: Sequence[Dict]) -> Dict:
         """MCP Tool: Batch write items to DynamoDB"""
+        ss = st.session_state
         cost = self.operation_costs["batch_write"] * len(items)
-        st.session_state.mcp_costs["total"] += cost
-        st.session_state.mcp_costs["operations"] += 1
+        self._charge(cost)
         
-        if not st.session_state.table_exists:
+        if not ss.table_exists:
             return {"success": False, "error": "Table does not exist", "cost": cost}
         
+        # Write in BatchWriteItem-sized pages, one dict merge per page.
+        # Fallback keys are only formatted for items without a user_id
         processed_items = []
-        for item in items:
-            item_key = item.get("user_id", f"batch_{len(processed_items)}")
-            st.session_state.table_items[item_key] = item
-            processed_items.append(item_key)
+        pages = range(0, len(items), BATCH_WRITE_LIMIT)
+        for start in pages:
+            page = items[start:start + BATCH_WRITE_LIMIT]
+            new_items = {item.get("user_id") or f"batch_{i}": item for i, item in enumerate(page, start)}
+            ss.table_items.update(new_items)
+            processed_items.extend(new_items)
+        self._items_changed()
         
         return {
             "success": True,
             "processed_items": processed_items,
             "count": len(processed_items),
+            "batch_calls": len(pages),
             "cost": cost
         }
 
-# Initialize MCP tools
+# Initialize MCP tools (stateless; all data lives in session state)
 mcp_tools = MCPDynamoDBTools()
 
 # Header
@@ -262,24 +371,19 @@ st.markdown("**Interactive demonstration of all essential DynamoDB operations us
 with st.sidebar:
     st.header("🔧 MCP Status")
     
-    st.markdown("""
-    <div class="mcp-tool">
-        <strong>DynamoDB MCP Server</strong><br>
-        Status: 🟢 Active<br>
-        Tools: 8 available
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(_MCP_STATUS_HTML, unsafe_allow_html=True)
     
     st.markdown("---")
     st.subheader("💰 Operation Costs")
-    st.metric("Total Cost", f"${st.session_state.mcp_costs['total']:.4f}")
-    st.metric("Operations", st.session_state.mcp_costs['operations'])
+    ss = st.session_state
+    st.metric("Total Cost", f"${ss.mcp_costs['total']:.4f}")
+    st.metric("Operations", ss.mcp_costs['operations'])
     
-    if st.session_state.table_exists:
+    if ss.table_exists:
         st.markdown("---")
         st.subheader("📊 Table Status")
         st.success("✅ Table Active")
-        st.metric("Items Count", len(st.session_state.table_items))
+        st.metric("Items Count", len(ss.table_items))
 
 # Main content
 tab1, tab2, tab3, tab4 = st.tabs(["🏗️ Table Operations", "📝 Item Operations", "🔍 Query Operations", "📊 Batch Operations"])
@@ -306,29 +410,14 @@ with tab1:
         
         result = mcp_tools.create_table(table_name, key_schema)
         
-        st.markdown(f"""
-        <div class="mcp-tool">
-            MCP Tool: create_table()<br>
-            Parameters: table_name="{table_name}", key_schema={key_schema}<br>
-            Cost: ${result['cost']:.4f}
-        </div>
-        """, unsafe_allow_html=True)
+        tool_card = MCP_TOOL_TMPL.format(tool="create_table", params=f'table_name="{table_name}", key_schema={key_schema}', cost=result['cost'])
         
         if result["success"]:
-            st.markdown(f"""
-            <div class="success-result">
-                ✅ <strong>Table Created Successfully</strong><br>
-                Table: {result['table_name']}<br>
-                Status: {result['status']}<br>
-                Key Schema: {result['key_schema']}
-            </div>
-            """, unsafe_allow_html=True)
+            result_card = TABLE_CREATED_TMPL.format(**result)
         else:
-            st.markdown(f"""
-            <div class="error-result">
-                ❌ <strong>Error:</strong> {result['error']}
-            </div>
-            """, unsafe_allow_html=True)
+            result_card = ERROR_TMPL.format(error=result['error'])
+        # Tool and result cards go out as one markdown element
+        st.markdown(tool_card + result_card, unsafe_allow_html=True)
 
 with tab2:
     st.subheader("Item CRUD Operations")
@@ -353,13 +442,7 @@ with tab2:
             item = {"user_id": user_id, "name": name, "email": email, "age": age, "city": city}
             result = mcp_tools.put_item(table_name, item)
             
-            st.markdown(f"""
-            <div class="mcp-tool">
-                MCP Tool: put_item()<br>
-                Parameters: item={item}<br>
-                Cost: ${result['cost']:.4f}
-            </div>
-            """, unsafe_allow_html=True)
+            st.markdown(MCP_TOOL_TMPL.format(tool="put_item", params=f"item={item}", cost=result['cost']), unsafe_allow_html=True)
             
             if result["success"]:
                 st.success(f"✅ Item added with key: {result['item_key']}")
@@ -368,9 +451,11 @@ with tab2:
         
         # Quick add sample data
         if st.button("🚀 Add Sample Data (5 items)", use_container_width=True):
-            for item in SAMPLE_ITEMS:
-                mcp_tools.put_item(table_name, item)
-            st.success("✅ Added 5 sample items")
+            result = mcp_tools.batch_write_item(table_name, SAMPLE_ITEMS)
+            if result["success"]:
+                st.success(f"✅ Added {result['count']} sample items")
+            else:
+                st.error(f"❌ Error: {result['error']}")
         
         st.markdown("---")
         
@@ -382,13 +467,7 @@ with tab2:
         if st.button("🔍 Get Item via MCP", use_container_width=True):
             result = mcp_tools.get_item(table_name, {"user_id": get_user_id})
             
-            st.markdown(f"""
-            <div class="mcp-tool">
-                MCP Tool: get_item()<br>
-                Parameters: key={{"user_id": "{get_user_id}"}}<br>
-                Cost: ${result['cost']:.4f}
-            </div>
-            """, unsafe_allow_html=True)
+            st.markdown(MCP_TOOL_TMPL.format(tool="get_item", params=f'key={{"user_id": "{get_user_id}"}}', cost=result['cost']), unsafe_allow_html=True)
             
             if result["success"]:
                 st.json(result["item"])
@@ -416,13 +495,7 @@ with tab2:
                 {":age": new_age, ":city": new_city}
             )
             
-            st.markdown(f"""
-            <div class="mcp-tool">
-                MCP Tool: update_item()<br>
-                Parameters: key={{"user_id": "{update_user_id}"}}, updates={{"age": {new_age}, "city": "{new_city}"}}<br>
-                Cost: ${result['cost']:.4f}
-            </div>
-            """, unsafe_allow_html=True)
+            st.markdown(MCP_TOOL_TMPL.format(tool="update_item", params=f'key={{"user_id": "{update_user_id}"}}, updates={{"age": {new_age}, "city": "{new_city}"}}', cost=result['cost']), unsafe_allow_html=True)
             
             if result["success"]:
                 st.success("✅ Item updated successfully")
@@ -440,13 +513,7 @@ with tab2:
         if st.button("🗑️ Delete Item via MCP", use_container_width=True):
             result = mcp_tools.delete_item(table_name, {"user_id": delete_user_id})
             
-            st.markdown(f"""
-            <div class="mcp-tool">
-                MCP Tool: delete_item()<br>
-                Parameters: key={{"user_id": "{delete_user_id}"}}<br>
-                Cost: ${result['cost']:.4f}
-            </div>
-            """, unsafe_allow_html=True)
+            st.markdown(MCP_TOOL_TMPL.format(tool="delete_item", params=f'key={{"user_id": "{delete_user_id}"}}', cost=result['cost']), unsafe_allow_html=True)
             
             if result["success"]:
                 st.success("✅ Item deleted successfully")
@@ -472,19 +539,12 @@ with tab3:
         if st.button("🔍 Query via MCP", use_container_width=True):
             result = mcp_tools.query(table_name, query_condition)
             
-            st.markdown(f"""
-            <div class="mcp-tool">
-                MCP Tool: query()<br>
-                Parameters: key_condition="{query_condition}"<br>
-                Cost: ${result['cost']:.4f}
-            </div>
-            """, unsafe_allow_html=True)
+            st.markdown(MCP_TOOL_TMPL.format(tool="query", params=f'key_condition="{query_condition}"', cost=result['cost']), unsafe_allow_html=True)
             
             if result["success"]:
                 st.success(f"✅ Query returned {result['count']} items")
                 if result["items"]:
-                    df = pd.DataFrame(result["items"])
-                    st.dataframe(df, use_container_width=True)
+                    st.dataframe(result["items_df"], use_container_width=True)
             else:
                 st.error(f"❌ Error: {result['error']}")
         
@@ -498,19 +558,12 @@ with tab3:
         if st.button("📊 Scan Table via MCP", use_container_width=True):
             result = mcp_tools.scan(table_name, scan_filter if scan_filter else None)
             
-            st.markdown(f"""
-            <div class="mcp-tool">
-                MCP Tool: scan()<br>
-                Parameters: filter_expression="{scan_filter or 'None'}"<br>
-                Cost: ${result['cost']:.4f}
-            </div>
-            """, unsafe_allow_html=True)
+            st.markdown(MCP_TOOL_TMPL.format(tool="scan", params=f'filter_expression="{scan_filter or "None"}"', cost=result['cost']), unsafe_allow_html=True)
             
             if result["success"]:
                 st.success(f"✅ Scan returned {result['count']} items (scanned {result['scanned_count']})")
                 if result["items"]:
-                    df = pd.DataFrame(result["items"])
-                    st.dataframe(df, use_container_width=True)
+                    st.dataframe(result["items_df"], use_container_width=True)
             else:
                 st.error(f"❌ Error: {result['error']}")
 
@@ -526,26 +579,23 @@ with tab4:
         batch_count = st.slider("Number of items to batch write:", 1, 10, 3)
         
         if st.button("📦 Batch Write via MCP", use_container_width=True):
-            batch_items = []
-            for i in range(batch_count):
-                item = {
-                    "user_id": f"batch_user_{i+1}",
-                    "name": f"Batch User {i+1}",
-                    "email": f"batch{i+1}@example.com",
-                    "age": random.randint(20, 60),
-                    "city": random.choice(["New York", "Los Angeles", "Chicago", "Houston"])
+            # Draw every age and city up front rather than once per item
+            ages = random.choices(BATCH_AGES, k=batch_count)
+            cities = random.choices(BATCH_CITIES, k=batch_count)
+            batch_items = [
+                {
+                    "user_id": f"batch_user_{i}",
+                    "name": f"Batch User {i}",
+                    "email": f"batch{i}@example.com",
+                    "age": age,
+                    "city": city
                 }
-                batch_items.append(item)
+                for i, age, city in zip(range(1, batch_count + 1), ages, cities)
+            ]
             
             result = mcp_tools.batch_write_item(table_name, batch_items)
             
-            st.markdown(f"""
-            <div class="mcp-tool">
-                MCP Tool: batch_write_item()<br>
-                Parameters: items_count={len(batch_items)}<br>
-                Cost: ${result['cost']:.4f}
-            </div>
-            """, unsafe_allow_html=True)
+            st.markdown(MCP_TOOL_TMPL.format(tool="batch_write_item", params=f"items_count={len(batch_items)}", cost=result['cost']), unsafe_allow_html=True)
             
             if result["success"]:
                 st.success(f"✅ Batch wrote {result['count']} items")
@@ -571,9 +621,12 @@ if st.session_state.mcp_costs['operations'] > 0:
         st.metric("Avg Cost/Op", f"${avg_cost:.4f}")
 
 # Reset button
-if st.button("🔄 Reset All Data", use_container_width=True):
+def _reset_all_data():
+    """Clear the table, history and costs before the rerun the click triggers"""
     st.session_state.table_exists = False
     st.session_state.table_items = {}
+    st.session_state.items_version += 1
     st.session_state.operation_history = []
     st.session_state.mcp_costs = {"total": 0.0, "operations": 0}
-    st.rerun()
\ No newline at end of file
+
+st.button("🔄 Reset All Data", use_container_width=True, on_click=_reset_all_data)
\ No newline at end of file